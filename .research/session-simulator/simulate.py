@@ -10,10 +10,13 @@ gets evicted from context?
 Uses real measured token counts from the agentquery example CLI.
 """
 
+import functools
 import itertools
 import json
+import math
 import os
 import sys
+from typing import NamedTuple
 
 # ===========================================================================
 # MEASURED CONSTANTS (from tiktoken cl100k_base on real CLI outputs)
@@ -51,7 +54,8 @@ QUERY_COSTS = {
 # ===========================================================================
 
 SESSION_LENGTHS = [10, 20, 50, 100]
-CONTEXT_EVICTION_RATES = [10, 20, 50, float('inf')]  # K turns before eviction; inf = never
+INF = math.inf
+CONTEXT_EVICTION_RATES = [10, 20, 50, INF]  # K turns before eviction; inf = never
 OUTPUT_FORMATS = ["compact", "json"]
 
 # Typical query mix in a session (proportions)
@@ -66,6 +70,21 @@ QUERY_MIX = {
 AVG_LIST_ITEMS = 10
 
 
+class SimResult(NamedTuple):
+    """Token economics for one simulated session."""
+    session_length: int
+    eviction_rate: float
+    output_format: str
+    schema_calls: int
+    total_schema_cost: int
+    total_alias_savings: float
+    net_balance: float
+    break_even_queries: float
+    avg_saving_per_query: float
+    query_breakdown: dict
+
+
+@functools.lru_cache(maxsize=None)
 def calculate_schema_calls(session_length: int, eviction_rate: float) -> int:
     """
     Calculate how many schema() calls an agent needs in a session.
@@ -73,7 +92,7 @@ def calculate_schema_calls(session_length: int, eviction_rate: float) -> int:
     First call is always needed (to learn the alias dictionary).
     Subsequent calls happen every K turns when context gets evicted.
     """
-    if eviction_rate == float('inf'):
+    if math.isinf(eviction_rate):
         return 1  # Only the initial call, dictionary never evicted
 
     # Initial call + one call per eviction cycle
@@ -101,27 +120,26 @@ def calculate_alias_savings_per_query(output_format: str, query_type: str) -> fl
     return 0
 
 
-def simulate_session(
-    session_length: int,
-    eviction_rate: float,
-    output_format: str,
-) -> dict:
-    """
-    Simulate a full agent session and calculate token economics.
+# Per-query savings for every (output_format, query_type), built once at import
+SAVINGS_PER_QUERY = {
+    (fmt, qtype): calculate_alias_savings_per_query(fmt, qtype)
+    for fmt in OUTPUT_FORMATS
+    for qtype in QUERY_MIX
+}
+
 
-    Returns a dict with all metrics.
+def calculate_query_savings(session_length: int, output_format: str) -> tuple:
     """
-    # Schema overhead
-    schema_calls = calculate_schema_calls(session_length, eviction_rate)
-    total_schema_cost = schema_calls * SCHEMA_TOTAL_ROUNDTRIP
+    Calculate alias savings across a session's query mix.
 
-    # Alias savings across all queries
+    Independent of eviction rate. Returns (total_savings, query_breakdown).
+    """
     total_savings = 0
     query_breakdown = {}
 
     for qtype, proportion in QUERY_MIX.items():
         n_queries = int(session_length * proportion)
-        per_query_saving = calculate_alias_savings_per_query(output_format, qtype)
+        per_query_saving = SAVINGS_PER_QUERY[output_format, qtype]
         type_savings = n_queries * per_query_saving
         total_savings += type_savings
         query_breakdown[qtype] = {
@@ -130,48 +148,95 @@ def simulate_session(
             "total_savings": type_savings,
         }
 
+    return total_savings, query_breakdown
+
+
+def build_result(
+    session_length: int,
+    eviction_rate: float,
+    output_format: str,
+    schema_calls: int,
+    total_savings: float,
+    query_breakdown: dict,
+) -> SimResult:
+    """
+    Combine schema overhead and alias savings into the metrics for one session.
+    """
+    total_schema_cost = schema_calls * SCHEMA_TOTAL_ROUNDTRIP
     net_balance = total_savings - total_schema_cost
 
     # Break-even: how many queries until savings >= schema cost
     avg_saving_per_query = total_savings / session_length if session_length > 0 else 0
     if avg_saving_per_query > 0:
         # Account for ongoing schema costs
-        savings_per_cycle = avg_saving_per_query * (eviction_rate if eviction_rate != float('inf') else session_length)
+        savings_per_cycle = avg_saving_per_query * (session_length if math.isinf(eviction_rate) else eviction_rate)
         if savings_per_cycle > SCHEMA_TOTAL_ROUNDTRIP:
             # Can break even within a cycle
             break_even = SCHEMA_TOTAL_ROUNDTRIP / avg_saving_per_query
         else:
-            break_even = float('inf')  # Never breaks even
+            break_even = INF  # Never breaks even
     else:
-        break_even = float('inf')
-
-    return {
-        "session_length": session_length,
-        "eviction_rate": eviction_rate,
-        "output_format": output_format,
-        "schema_calls": schema_calls,
-        "total_schema_cost": total_schema_cost,
-        "total_alias_savings": total_savings,
-        "net_balance": net_balance,
-        "break_even_queries": break_even,
-        "avg_saving_per_query": avg_saving_per_query,
-        "query_breakdown": query_breakdown,
+        break_even = INF
+
+    return SimResult(
+        session_length=session_length,
+        eviction_rate=eviction_rate,
+        output_format=output_format,
+        schema_calls=schema_calls,
+        total_schema_cost=total_schema_cost,
+        total_alias_savings=total_savings,
+        net_balance=net_balance,
+        break_even_queries=break_even,
+        avg_saving_per_query=avg_saving_per_query,
+        query_breakdown=query_breakdown,
+    )
+
+
+def run_sweep() -> list[SimResult]:
+    """
+    Simulate every (session_length, eviction_rate, output_format) combination.
+
+    The grid factors: schema calls depend only on (session_length, eviction_rate)
+    and alias savings only on (session_length, output_format). Each axis is
+    computed once and the full grid is assembled from the two tables.
+    """
+    schema_calls = {
+        (session_len, eviction_k): calculate_schema_calls(session_len, eviction_k)
+        for session_len, eviction_k in itertools.product(SESSION_LENGTHS, CONTEXT_EVICTION_RATES)
+    }
+    savings = {
+        (session_len, fmt): calculate_query_savings(session_len, fmt)
+        for session_len, fmt in itertools.product(SESSION_LENGTHS, OUTPUT_FORMATS)
     }
+    return [
+        build_result(
+            session_len, eviction_k, fmt,
+            schema_calls[session_len, eviction_k], *savings[session_len, fmt],
+        )
+        for session_len, eviction_k, fmt in itertools.product(
+            SESSION_LENGTHS, CONTEXT_EVICTION_RATES, OUTPUT_FORMATS
+        )
+    ]
 
 
 def format_eviction(k):
-    return "never" if k == float('inf') else str(int(k))
+    return "never" if math.isinf(k) else str(int(k))
 
 
-def main():
-    results = []
+def format_result_row(r: SimResult) -> str:
+    """One row of the per-format results table."""
+    be = "never" if math.isinf(r.break_even_queries) else f"{r.break_even_queries:.0f}"
+    net_sign = "+" if r.net_balance > 0 else ""
+    return (
+        f"| {r.session_length} | {format_eviction(r.eviction_rate)} | {r.schema_calls} | "
+        f"{r.total_schema_cost} | {r.total_alias_savings} | "
+        f"{net_sign}{r.net_balance} | {be} |"
+    )
+
 
+def main():
     # Run all parameter combinations
-    for session_len, eviction_k, fmt in itertools.product(
-        SESSION_LENGTHS, CONTEXT_EVICTION_RATES, OUTPUT_FORMATS
-    ):
-        result = simulate_session(session_len, eviction_k, fmt)
-        results.append(result)
+    results = run_sweep()
 
     # Build output report
     lines = []
@@ -202,17 +267,7 @@ def main():
     lines.append("| Session Length | Eviction K | Schema Calls | Schema Cost | Alias Savings | Net Balance | Break-Even |")
     lines.append("|--------------:|-----------:|-------------:|------------:|--------------:|------------:|-----------:|")
 
-    for r in results:
-        if r["output_format"] != "compact":
-            continue
-        be = f"{r['break_even_queries']:.0f}" if r["break_even_queries"] != float('inf') else "never"
-        evict = format_eviction(r["eviction_rate"])
-        net_sign = "+" if r["net_balance"] > 0 else ""
-        lines.append(
-            f"| {r['session_length']} | {evict} | {r['schema_calls']} | "
-            f"{r['total_schema_cost']} | {r['total_alias_savings']} | "
-            f"{net_sign}{r['net_balance']} | {be} |"
-        )
+    lines.extend([format_result_row(r) for r in results if r.output_format == "compact"])
 
     lines.append("")
 
@@ -224,17 +279,7 @@ def main():
     lines.append("| Session Length | Eviction K | Schema Calls | Schema Cost | Alias Savings | Net Balance | Break-Even |")
     lines.append("|--------------:|-----------:|-------------:|------------:|--------------:|------------:|-----------:|")
 
-    for r in results:
-        if r["output_format"] != "json":
-            continue
-        be = f"{r['break_even_queries']:.0f}" if r["break_even_queries"] != float('inf') else "never"
-        evict = format_eviction(r["eviction_rate"])
-        net_sign = "+" if r["net_balance"] > 0 else ""
-        lines.append(
-            f"| {r['session_length']} | {evict} | {r['schema_calls']} | "
-            f"{r['total_schema_cost']} | {r['total_alias_savings']} | "
-            f"{net_sign}{r['net_balance']} | {be} |"
-        )
+    lines.extend([format_result_row(r) for r in results if r.output_format == "json"])
 
     lines.append("")
 
@@ -246,23 +291,23 @@ def main():
     lines.append("| Session | Eviction | Compact Net | JSON Net | Better Format | Margin |")
     lines.append("|--------:|---------:|------------:|---------:|--------------:|-------:|")
 
+    by_key = {
+        (r.session_length, r.eviction_rate, r.output_format): r
+        for r in results
+    }
     for session_len in SESSION_LENGTHS:
         for eviction_k in CONTEXT_EVICTION_RATES:
-            compact = [r for r in results if r["session_length"] == session_len
-                       and r["eviction_rate"] == eviction_k
-                       and r["output_format"] == "compact"][0]
-            json_r = [r for r in results if r["session_length"] == session_len
-                      and r["eviction_rate"] == eviction_k
-                      and r["output_format"] == "json"][0]
-
-            better = "JSON" if json_r["net_balance"] > compact["net_balance"] else "Compact"
-            margin = abs(json_r["net_balance"] - compact["net_balance"])
+            c_net = by_key[session_len, eviction_k, "compact"].net_balance
+            j_net = by_key[session_len, eviction_k, "json"].net_balance
+
+            better = "JSON" if j_net > c_net else "Compact"
+            margin = abs(j_net - c_net)
             evict = format_eviction(eviction_k)
-            c_sign = "+" if compact["net_balance"] > 0 else ""
-            j_sign = "+" if json_r["net_balance"] > 0 else ""
+            c_sign = "+" if c_net > 0 else ""
+            j_sign = "+" if j_net > 0 else ""
             lines.append(
-                f"| {session_len} | {evict} | {c_sign}{compact['net_balance']} | "
-                f"{j_sign}{json_r['net_balance']} | {better} | {margin} |"
+                f"| {session_len} | {evict} | {c_sign}{c_net} | "
+                f"{j_sign}{j_net} | {better} | {margin} |"
             )
 
     lines.append("")
@@ -274,10 +319,10 @@ def main():
     lines.append("")
 
     # Count how many scenarios are net positive
-    compact_positive = sum(1 for r in results if r["output_format"] == "compact" and r["net_balance"] > 0)
-    compact_total = sum(1 for r in results if r["output_format"] == "compact")
-    json_positive = sum(1 for r in results if r["output_format"] == "json" and r["net_balance"] > 0)
-    json_total = sum(1 for r in results if r["output_format"] == "json")
+    compact_positive = sum(1 for r in results if r.output_format == "compact" and r.net_balance > 0)
+    compact_total = sum(1 for r in results if r.output_format == "compact")
+    json_positive = sum(1 for r in results if r.output_format == "json" and r.net_balance > 0)
+    json_total = sum(1 for r in results if r.output_format == "json")
 
     lines.append(f"### Scenarios with positive net balance (aliases pay off)")
     lines.append(f"- Compact format: **{compact_positive}/{compact_total}** scenarios")
@@ -285,23 +330,23 @@ def main():
     lines.append("")
 
     # Best and worst cases
-    all_compact = [r for r in results if r["output_format"] == "compact"]
-    all_json = [r for r in results if r["output_format"] == "json"]
+    all_compact = [r for r in results if r.output_format == "compact"]
+    all_json = [r for r in results if r.output_format == "json"]
 
-    best_compact = max(all_compact, key=lambda r: r["net_balance"])
-    worst_compact = min(all_compact, key=lambda r: r["net_balance"])
-    best_json = max(all_json, key=lambda r: r["net_balance"])
-    worst_json = min(all_json, key=lambda r: r["net_balance"])
+    best_compact = max(all_compact, key=lambda r: r.net_balance)
+    worst_compact = min(all_compact, key=lambda r: r.net_balance)
+    best_json = max(all_json, key=lambda r: r.net_balance)
+    worst_json = min(all_json, key=lambda r: r.net_balance)
 
     lines.append("### Best/Worst Cases")
     lines.append("")
     lines.append(f"**Compact format:**")
-    lines.append(f"- Best: session={best_compact['session_length']}, eviction={format_eviction(best_compact['eviction_rate'])} → net={best_compact['net_balance']:+d} tokens")
-    lines.append(f"- Worst: session={worst_compact['session_length']}, eviction={format_eviction(worst_compact['eviction_rate'])} → net={worst_compact['net_balance']:+d} tokens")
+    lines.append(f"- Best: session={best_compact.session_length}, eviction={format_eviction(best_compact.eviction_rate)} → net={best_compact.net_balance:+d} tokens")
+    lines.append(f"- Worst: session={worst_compact.session_length}, eviction={format_eviction(worst_compact.eviction_rate)} → net={worst_compact.net_balance:+d} tokens")
     lines.append("")
     lines.append(f"**JSON format:**")
-    lines.append(f"- Best: session={best_json['session_length']}, eviction={format_eviction(best_json['eviction_rate'])} → net={best_json['net_balance']:+d} tokens")
-    lines.append(f"- Worst: session={worst_json['session_length']}, eviction={format_eviction(worst_json['eviction_rate'])} → net={worst_json['net_balance']:+d} tokens")
+    lines.append(f"- Best: session={best_json.session_length}, eviction={format_eviction(best_json.eviction_rate)} → net={best_json.net_balance:+d} tokens")
+    lines.append(f"- Worst: session={worst_json.session_length}, eviction={format_eviction(worst_json.eviction_rate)} → net={worst_json.net_balance:+d} tokens")
     lines.append("")
 
     # Key insight
@@ -334,15 +379,16 @@ def main():
     # Also dump raw data as JSON
     json_path = os.path.join(script_dir, "results.json")
     # Convert inf to string for JSON serialization
-    serializable = []
-    for r in results:
-        r_copy = dict(r)
-        r_copy["eviction_rate"] = format_eviction(r["eviction_rate"])
-        r_copy["break_even_queries"] = (
-            r["break_even_queries"] if r["break_even_queries"] != float('inf')
-            else "never"
-        )
-        serializable.append(r_copy)
+    serializable = [
+        r._replace(
+            eviction_rate=format_eviction(r.eviction_rate),
+            break_even_queries=(
+                "never" if math.isinf(r.break_even_queries)
+                else r.break_even_queries
+            ),
+        )._asdict()
+        for r in results
+    ]
     with open(json_path, "w") as f:
         json.dump(serializable, f, indent=2)
 
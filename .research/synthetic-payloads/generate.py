@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
-"""Generate synthetic payloads in 3 formats x 4 scales for token measurement."""
+"""Generate synthetic payloads in 3 formats x 4 scales for token measurement.
 
+By default each scale draws fresh items from one seeded stream, which is what
+the committed payloads and measurements were produced with. --shared-pool
+generates max(SCALES) items once and takes prefixes for the smaller scales:
+less work, but different output bytes.
+"""
+
+import argparse
+import csv
 import json
 import os
 import random
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+try:
+    import orjson
+except ImportError:  # optional speedup; to_json gives the same bytes either way
+    orjson = None
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 FIELDS_FULL = ["id", "name", "status", "assignee", "description", "priority", "created", "updated"]
 FIELDS_ALIAS = ["i", "n", "s", "a", "d", "p", "c", "u"]
 SCALES = [5, 20, 100, 500]
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB: the largest payload goes out in a few syscalls
 
 # Realistic data pools
 TASK_PREFIXES = [
@@ -52,13 +67,15 @@ ASSIGNEES = [
     "olivia", "pat", "quinn", "rosa", "sam", "tina",
 ]
 
+# Positional slots: {0}=verb, {1}=component, {2}=scenario, {3}=problem, {4}=goal
 DESCRIPTION_TEMPLATES = [
-    "Need to {verb} the {component} to handle {scenario}. Current implementation {problem}.",
-    "The {component} has issues when {scenario}. We should {verb} it to {goal}.",
-    "{component} needs attention: {scenario} causes {problem}. Plan: {verb} and {goal}.",
-    "As discussed in standup, {verb} {component}. {scenario} is blocking {goal}.",
-    "Follow-up from incident: {component} failed during {scenario}. Must {verb} to prevent {problem}.",
+    "Need to {0} the {1} to handle {2}. Current implementation {3}.",
+    "The {1} has issues when {2}. We should {0} it to {4}.",
+    "{1} needs attention: {2} causes {3}. Plan: {0} and {4}.",
+    "As discussed in standup, {0} {1}. {2} is blocking {4}.",
+    "Follow-up from incident: {1} failed during {2}. Must {0} to prevent {3}.",
 ]
+DESCRIPTION_FORMATTERS = [tmpl.format for tmpl in DESCRIPTION_TEMPLATES]
 
 DESC_VERBS = ["refactor", "rewrite", "patch", "extend", "simplify", "harden", "decouple", "wrap"]
 DESC_COMPONENTS = [
@@ -82,108 +99,121 @@ DESC_GOALS = [
     "unblock the frontend team", "pass the security audit",
 ]
 
+DATE_START = datetime(2025, 1, 1)
+DATE_END = datetime(2026, 2, 12)
+DATE_SPAN_DAYS = (DATE_END - DATE_START).days
+MAX_DAYS_AFTER = 30  # updated is 0..30 days after created, clamped to DATE_END
 
-def generate_description():
-    tmpl = random.choice(DESCRIPTION_TEMPLATES)
-    return tmpl.format(
-        verb=random.choice(DESC_VERBS),
-        component=random.choice(DESC_COMPONENTS),
-        scenario=random.choice(DESC_SCENARIOS),
-        problem=random.choice(DESC_PROBLEMS),
-        goal=random.choice(DESC_GOALS),
-    )
+# Day offset from DATE_START -> "YYYY-MM-DD", formatted once at import.
+# Offsets past DATE_END clamp to it, so updated needs no min().
+DATE_STRS = [
+    (DATE_START + timedelta(days=min(d, DATE_SPAN_DAYS))).strftime("%Y-%m-%d")
+    for d in range(DATE_SPAN_DAYS + MAX_DAYS_AFTER + 1)
+]
 
 
-def generate_task_name():
-    return f"{random.choice(TASK_PREFIXES)} {random.choice(TASK_SUBJECTS)}"
+def generate_description(rng):
+    choice = rng.choice
+    fmt = choice(DESCRIPTION_FORMATTERS)
+    return fmt(
+        choice(DESC_VERBS),
+        choice(DESC_COMPONENTS),
+        choice(DESC_SCENARIOS),
+        choice(DESC_PROBLEMS),
+        choice(DESC_GOALS),
+    )
 
 
-def random_date(start_year=2025, end_year=2026):
-    start = datetime(start_year, 1, 1)
-    end = datetime(end_year, 2, 12)
-    delta = end - start
-    rand_days = random.randint(0, delta.days)
-    d = start + timedelta(days=rand_days)
-    return d.strftime("%Y-%m-%d")
+def generate_task_name(rng):
+    return f"{rng.choice(TASK_PREFIXES)} {rng.choice(TASK_SUBJECTS)}"
 
 
-def generate_items(n):
+def generate_items(n, rng):
+    """Generate n items as tuples of strings in FIELDS_FULL order."""
+    choice = rng.choice
+    randint = rng.randint
     items = []
+    append = items.append
     for i in range(1, n + 1):
-        created = random_date()
+        created = randint(0, DATE_SPAN_DAYS)
         # updated is same or after created
-        created_dt = datetime.strptime(created, "%Y-%m-%d")
-        days_after = random.randint(0, 30)
-        updated_dt = min(created_dt + timedelta(days=days_after), datetime(2026, 2, 12))
-        items.append({
-            "id": f"TASK-{i:04d}",
-            "name": generate_task_name(),
-            "status": random.choice(STATUSES),
-            "assignee": random.choice(ASSIGNEES),
-            "description": generate_description(),
-            "priority": random.choice(PRIORITIES),
-            "created": created,
-            "updated": updated_dt.strftime("%Y-%m-%d"),
-        })
+        updated = created + randint(0, MAX_DAYS_AFTER)
+        append((
+            f"TASK-{i:04d}",
+            generate_task_name(rng),
+            choice(STATUSES),
+            choice(ASSIGNEES),
+            generate_description(rng),
+            choice(PRIORITIES),
+            DATE_STRS[created],
+            DATE_STRS[updated],
+        ))
     return items
 
 
 def to_json(items):
-    """Standard JSON array."""
-    return json.dumps(items, indent=2)
-
-
-def to_compact_full(items):
-    """CSV-style with full field names as header."""
-    header = ",".join(FIELDS_FULL)
-    rows = []
-    for item in items:
-        row_vals = []
-        for f in FIELDS_FULL:
-            val = str(item[f])
-            # Quote if contains comma
-            if "," in val:
-                val = f'"{val}"'
-            row_vals.append(val)
-        rows.append(",".join(row_vals))
-    return header + "\n" + "\n".join(rows)
-
-
-def to_compact_alias(items):
-    """CSV-style with abbreviated field names as header."""
-    header = ",".join(FIELDS_ALIAS)
-    rows = []
-    for item in items:
-        row_vals = []
-        for f in FIELDS_FULL:
-            val = str(item[f])
-            if "," in val:
-                val = f'"{val}"'
-            row_vals.append(val)
-        rows.append(",".join(row_vals))
-    return header + "\n" + "\n".join(rows)
+    """Standard JSON array (indent=2), as UTF-8 bytes."""
+    objects = [dict(zip(FIELDS_FULL, item)) for item in items]
+    if orjson is not None:
+        return orjson.dumps(objects, option=orjson.OPT_INDENT_2)
+    # orjson writes non-ASCII as raw UTF-8, so the fallback must not escape it
+    return json.dumps(objects, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# writerow() returns what write() returns, so this yields each formatted line.
+# The default "\r\n" terminator is kept because csv only quotes fields containing
+# characters of the terminator; format_csv_line strips it again.
+_CSV_LINE_WRITER = csv.writer(SimpleNamespace(write=str))
+
+
+def format_csv_line(fields):
+    """One CSV line (quoted as needed) without its line terminator."""
+    return _CSV_LINE_WRITER.writerow(fields)[:-2]
+
+
+def format_compact_rows(items):
+    """CSV-style data rows, each preceded by a newline. Shared by both compact variants."""
+    return "".join(["\n" + format_csv_line(item) for item in items])
+
+
+def write_compact(f, header_fields, rows):
+    """Header line followed by preformatted rows (no trailing newline)."""
+    f.write(format_csv_line(header_fields))
+    f.write(rows)
 
 
 def main():
-    random.seed(42)  # Reproducible
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--shared-pool", action="store_true",
+        help="take each scale as a prefix of one max-scale item pool (changes output)",
+    )
+    args = parser.parse_args()
+
+    # Reproducible: one seeded stream shared across scales, in order
+    rng = random.Random(42)
+    pool = generate_items(max(SCALES), rng) if args.shared_pool else None
 
     for scale in SCALES:
-        items = generate_items(scale)
+        items = pool[:scale] if pool is not None else generate_items(scale, rng)
 
         # JSON variant
         json_path = os.path.join(SCRIPT_DIR, f"json-{scale}.txt")
-        with open(json_path, "w") as f:
+        with open(json_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
             f.write(to_json(items))
 
+        # Both compact variants share data rows; only the header differs
+        rows = format_compact_rows(items)
+
         # Compact full field names
         compact_full_path = os.path.join(SCRIPT_DIR, f"compact-full-{scale}.txt")
-        with open(compact_full_path, "w") as f:
-            f.write(to_compact_full(items))
+        with open(compact_full_path, "w", newline="", buffering=WRITE_BUFFER_SIZE) as f:
+            write_compact(f, FIELDS_FULL, rows)
 
         # Compact aliased field names
         compact_alias_path = os.path.join(SCRIPT_DIR, f"compact-alias-{scale}.txt")
-        with open(compact_alias_path, "w") as f:
-            f.write(to_compact_alias(items))
+        with open(compact_alias_path, "w", newline="", buffering=WRITE_BUFFER_SIZE) as f:
+            write_compact(f, FIELDS_ALIAS, rows)
 
         print(f"Generated scale={scale}: json-{scale}.txt, compact-full-{scale}.txt, compact-alias-{scale}.txt")
 
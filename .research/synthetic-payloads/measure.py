@@ -9,212 +9,268 @@ Produces a comparison table showing:
 - Absolute token savings from aliases per scale
 """
 
-import os
+import functools
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import tiktoken
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPORT_PATH = SCRIPT_DIR.parent / "260212_field-alias-token-measurements.md"
+CACHE_PATH = SCRIPT_DIR / ".measure_cache.json"  # token counts by content digest
+ENCODING_NAME = "cl100k_base"
+REPORT_BUFFER_SIZE = 64 * 1024  # larger than the whole report: one write() syscall
 SCALES = [5, 20, 100, 500]
 VARIANTS = ["json", "compact-full", "compact-alias"]
 
-enc = tiktoken.get_encoding("cl100k_base")
+
+@functools.lru_cache(maxsize=1)
+def _encoder() -> tiktoken.Encoding:
+    """cl100k_base, loaded on first use and reused (building the BPE tables is slow)."""
+    return tiktoken.get_encoding(ENCODING_NAME)
+
+
+# Token counts memoized by content digest, so identical payloads encode once
+_token_counts: dict[bytes, int] = {}
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def count_payload_tokens(data: bytes) -> int:
+    """Token count for a UTF-8 payload; decoded and encoded only on a memo miss.
+
+    Payloads contain no special tokens, so the ordinary encoder gives the same
+    counts as encode() without the special-token scan. tiktoken releases the
+    GIL while encoding, so calls from several threads run in parallel.
+    """
+    key = _digest(data)
+    if key not in _token_counts:
+        _token_counts[key] = len(_encoder().encode_ordinary(data.decode("utf-8")))
+    return _token_counts[key]
+
+
+def load_token_cache() -> None:
+    """Seed the memo from CACHE_PATH, so unchanged payloads skip tokenization on re-runs.
+
+    A missing, unreadable or malformed cache is treated as empty; entries that
+    are not a hex digest mapped to an int count are skipped.
+    """
+    try:
+        cached = json.loads(CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return
+    if not isinstance(cached, dict) or cached.get("encoding") != ENCODING_NAME:
+        return
+    counts = cached.get("counts")
+    if not isinstance(counts, dict):
+        return
+    for digest, count in counts.items():
+        if type(count) is not int:  # bool is an int subclass but not a count
+            continue
+        try:
+            _token_counts[bytes.fromhex(digest)] = count
+        except (ValueError, TypeError):
+            continue
+
+
+def save_token_cache() -> None:
+    counts = {digest.hex(): count for digest, count in _token_counts.items()}
+    CACHE_PATH.write_text(json.dumps({"encoding": ENCODING_NAME, "counts": counts}, indent=2, sort_keys=True))
+
+
+def pct_reduction(before: list[int], after: list[int]) -> list[float]:
+    """Element-wise % reduction from before to after (0 where before is 0)."""
+    return [(b - a) / b * 100 if b else 0.0 for b, a in zip(before, after)]
 
 
-def count_tokens(text: str) -> int:
-    return len(enc.encode(text))
+def read_payload(variant: str, scale: int) -> bytes:
+    """Raw UTF-8 payload; decoded only if it needs tokenizing."""
+    return (SCRIPT_DIR / f"{variant}-{scale}.txt").read_bytes()
 
 
-def read_payload(variant: str, scale: int) -> str:
-    path = os.path.join(SCRIPT_DIR, f"{variant}-{scale}.txt")
-    with open(path, "r") as f:
-        return f.read()
+def measure_payload(variant: str, scale: int) -> tuple[int, int]:
+    """(token_count, byte_size) for one payload file."""
+    data = read_payload(variant, scale)
+    return count_payload_tokens(data), len(data)
 
 
 def main():
     # Collect measurements
-    data = {}  # data[scale][variant] = token_count
-    byte_sizes = {}  # byte_sizes[scale][variant] = byte_count
-
-    for scale in SCALES:
-        data[scale] = {}
-        byte_sizes[scale] = {}
-        for variant in VARIANTS:
-            text = read_payload(variant, scale)
-            tokens = count_tokens(text)
-            data[scale][variant] = tokens
-            byte_sizes[scale][variant] = len(text.encode("utf-8"))
-            print(f"  {variant}-{scale}: {tokens:,} tokens ({len(text.encode('utf-8')):,} bytes)")
+    # One column per variant, indexed by position in SCALES
+    tokens = {variant: [0] * len(SCALES) for variant in VARIANTS}
+    byte_sizes = {variant: [0] * len(SCALES) for variant in VARIANTS}
+
+    # Counts from previous runs; rewritten below only if new payloads were tokenized
+    load_token_cache()
+    n_cached = len(_token_counts)
+
+    # One task per payload file: reads and tokenization both release the GIL,
+    # so small files' I/O overlaps with encoding the large ones
+    pairs = [(i, scale, variant) for i, scale in enumerate(SCALES) for variant in VARIANTS]
+    with ThreadPoolExecutor(max_workers=len(pairs)) as pool:
+        measured = list(pool.map(lambda p: measure_payload(p[2], p[1]), pairs))
+    if len(_token_counts) != n_cached:
+        save_token_cache()
+
+    for (i, scale, variant), (ntokens, nbytes) in zip(pairs, measured):
+        tokens[variant][i] = ntokens
+        byte_sizes[variant][i] = nbytes
+        print(f"  {variant}-{scale}: {ntokens:,} tokens ({nbytes:,} bytes)")
 
     print()
 
-    # Build markdown report
-    lines = []
-    lines.append("# Field Alias Token Measurement Results")
-    lines.append("")
-    lines.append("**Date:** 2026-02-12")
-    lines.append("**Encoding:** cl100k_base (GPT-4 / Claude-compatible BPE tokenizer)")
-    lines.append("**Seed:** 42 (reproducible)")
-    lines.append("")
-    lines.append("## Methodology")
-    lines.append("")
-    lines.append("Generated synthetic task tracker payloads at 4 scales (5, 20, 100, 500 items)")
-    lines.append("with 8 fields per item: id, name, status, assignee, description, priority, created, updated.")
-    lines.append("")
-    lines.append("Three format variants per scale:")
-    lines.append("- **JSON**: Standard `json.dumps(items, indent=2)` — pretty-printed JSON array")
-    lines.append("- **Compact-full**: CSV-style with full field names as header, data rows below")
-    lines.append("- **Compact-alias**: Same CSV-style but header uses 1-char abbreviations (id->i, name->n, etc.)")
-    lines.append("")
-    lines.append("Token counts measured with `tiktoken` using `cl100k_base` encoding.")
-    lines.append("")
-
-    # Table 1: Raw counts
-    lines.append("## 1. Raw Token Counts")
-    lines.append("")
-    lines.append("| Scale | JSON | Compact-Full | Compact-Alias | JSON bytes | Compact-Full bytes | Compact-Alias bytes |")
-    lines.append("|------:|-----:|-------------:|--------------:|-----------:|-------------------:|--------------------:|")
-    for scale in SCALES:
-        j = data[scale]["json"]
-        cf = data[scale]["compact-full"]
-        ca = data[scale]["compact-alias"]
-        jb = byte_sizes[scale]["json"]
-        cfb = byte_sizes[scale]["compact-full"]
-        cab = byte_sizes[scale]["compact-alias"]
-        lines.append(f"| {scale} | {j:,} | {cf:,} | {ca:,} | {jb:,} | {cfb:,} | {cab:,} |")
-    lines.append("")
-
-    # Table 2: JSON -> Compact-Full savings
-    lines.append("## 2. Savings: JSON to Compact-Full")
-    lines.append("")
-    lines.append("| Scale | JSON Tokens | Compact-Full Tokens | Saved | % Reduction |")
-    lines.append("|------:|------------:|--------------------:|------:|------------:|")
-    for scale in SCALES:
-        j = data[scale]["json"]
-        cf = data[scale]["compact-full"]
-        saved = j - cf
-        pct = (saved / j) * 100
-        lines.append(f"| {scale} | {j:,} | {cf:,} | {saved:,} | {pct:.1f}% |")
-    lines.append("")
-
-    # Table 3: Compact-Full -> Compact-Alias savings (THE KEY METRIC)
-    lines.append("## 3. Marginal Savings: Compact-Full to Compact-Alias (KEY METRIC)")
-    lines.append("")
-    lines.append("This measures the **incremental benefit** of abbreviating field names in the header,")
-    lines.append("given that we already use compact tabular format.")
-    lines.append("")
-    lines.append("| Scale | Compact-Full Tokens | Compact-Alias Tokens | Tokens Saved | % Reduction | Bytes Saved |")
-    lines.append("|------:|--------------------:|---------------------:|-------------:|------------:|------------:|")
-    for scale in SCALES:
-        cf = data[scale]["compact-full"]
-        ca = data[scale]["compact-alias"]
-        saved = cf - ca
-        pct = (saved / cf) * 100 if cf > 0 else 0
-        bytes_saved = byte_sizes[scale]["compact-full"] - byte_sizes[scale]["compact-alias"]
-        lines.append(f"| {scale} | {cf:,} | {ca:,} | {saved:,} | {pct:.2f}% | {bytes_saved:,} |")
-    lines.append("")
-
-    # Table 4: Full comparison summary
-    lines.append("## 4. Full Comparison Summary")
-    lines.append("")
-    lines.append("| Scale | JSON | Compact-Full | Compact-Alias | JSON->CF % | CF->CA % | JSON->CA % |")
-    lines.append("|------:|-----:|-------------:|--------------:|-----------:|---------:|-----------:|")
-    for scale in SCALES:
-        j = data[scale]["json"]
-        cf = data[scale]["compact-full"]
-        ca = data[scale]["compact-alias"]
-        j_cf = ((j - cf) / j) * 100
-        cf_ca = ((cf - ca) / cf) * 100 if cf > 0 else 0
-        j_ca = ((j - ca) / j) * 100
-        lines.append(f"| {scale} | {j:,} | {cf:,} | {ca:,} | {j_cf:.1f}% | {cf_ca:.2f}% | {j_ca:.1f}% |")
-    lines.append("")
-
-    # Table 5: Tokens per item
-    lines.append("## 5. Tokens Per Item (Amortized)")
-    lines.append("")
-    lines.append("| Scale | JSON/item | Compact-Full/item | Compact-Alias/item |")
-    lines.append("|------:|----------:|------------------:|-------------------:|")
-    for scale in SCALES:
-        j = data[scale]["json"]
-        cf = data[scale]["compact-full"]
-        ca = data[scale]["compact-alias"]
-        lines.append(f"| {scale} | {j/scale:.1f} | {cf/scale:.1f} | {ca/scale:.1f} |")
-    lines.append("")
-
-    # Analysis
-    lines.append("## 6. Analysis")
-    lines.append("")
-
-    # Calculate averages for the key metric
-    cf_ca_pcts = []
-    cf_ca_abs = []
-    j_cf_pcts = []
-    for scale in SCALES:
-        cf = data[scale]["compact-full"]
-        ca = data[scale]["compact-alias"]
-        j = data[scale]["json"]
-        cf_ca_pcts.append(((cf - ca) / cf) * 100)
-        cf_ca_abs.append(cf - ca)
-        j_cf_pcts.append(((j - cf) / j) * 100)
-
-    avg_j_cf = sum(j_cf_pcts) / len(j_cf_pcts)
-    avg_cf_ca = sum(cf_ca_pcts) / len(cf_ca_pcts)
-
-    lines.append("### JSON to Compact-Full: Large, Consistent Win")
-    lines.append("")
-    lines.append(f"Switching from JSON to compact tabular format saves **~{avg_j_cf:.0f}%** of tokens on average.")
-    lines.append("This is a substantial reduction driven by eliminating:")
-    lines.append("- Repeated field name keys on every item")
-    lines.append("- JSON structural characters (`{{`, `}}`, `[`, `]`, `:`, `\"`)")
-    lines.append("- Indentation whitespace")
-    lines.append("")
-    lines.append("The savings scale well: they remain consistent as item count grows,")
-    lines.append("because the overhead is proportional to the number of items in JSON.")
-    lines.append("")
-
-    lines.append("### Compact-Full to Compact-Alias: Negligible Marginal Benefit")
-    lines.append("")
-    lines.append(f"Abbreviating field names in the header saves **~{avg_cf_ca:.2f}%** of tokens on average.")
-    lines.append(f"In absolute terms, the savings are **{cf_ca_abs[0]} tokens** (5 items) to **{cf_ca_abs[-1]} tokens** (500 items).")
-    lines.append("")
-    lines.append("Why so small? Because in the compact format, field names appear **only once** — in the header row.")
-    lines.append("The header `id,name,status,assignee,description,priority,created,updated` is a single line")
-    lines.append("consuming a fixed number of tokens regardless of how many data rows follow.")
-    lines.append("Abbreviating it to `i,n,s,a,d,p,c,u` saves those few tokens once, and that's it.")
-    lines.append("")
-    lines.append("The data rows (which dominate the payload) are identical in both variants.")
-    lines.append("")
-
-    lines.append("### Cost-Benefit Verdict")
-    lines.append("")
-    lines.append("| Factor | Assessment |")
-    lines.append("|--------|-----------|")
-    lines.append(f"| Token savings | {avg_cf_ca:.2f}% average — negligible |")
-    lines.append(f"| Absolute savings at 500 items | {cf_ca_abs[-1]} tokens — trivial |")
-    lines.append("| Readability cost | High — `i,n,s,a,d,p,c,u` is unreadable without a legend |")
-    lines.append("| Implementation complexity | Moderate — need alias registry, mapping, docs |")
-    lines.append("| Agent confusion risk | Non-trivial — agents may misinterpret abbreviated headers |")
-    lines.append("| Schema discoverability | Degraded — header no longer self-documenting |")
-    lines.append("")
-    lines.append("**Recommendation: Do NOT implement field name aliases.**")
-    lines.append("")
-    lines.append("The marginal token savings are negligible compared to the readability and complexity costs.")
-    lines.append("The big win is already captured by switching from JSON to compact tabular format.")
-    lines.append("Further compression efforts should target the data values themselves (e.g., date format")
-    lines.append("abbreviation, status code mapping) rather than the one-time header line, though even those")
-    lines.append("are unlikely to be worth the tradeoff.")
-    lines.append("")
-
-    # Write report
-    report_path = os.path.join(SCRIPT_DIR, "..", "260212_field-alias-token-measurements.md")
-    report_path = os.path.normpath(report_path)
-    with open(report_path, "w") as f:
-        f.write("\n".join(lines))
-    print(f"Report written to: {report_path}")
+    # Bind each variant's columns once for the report
+    tok_j, tok_cf, tok_ca = tokens["json"], tokens["compact-full"], tokens["compact-alias"]
+    bytes_j, bytes_cf, bytes_ca = byte_sizes["json"], byte_sizes["compact-full"], byte_sizes["compact-alias"]
+
+    # Derived columns, computed once and shared by the tables and the analysis
+    pct_j_cf = pct_reduction(tok_j, tok_cf)
+    pct_cf_ca = pct_reduction(tok_cf, tok_ca)
+    pct_j_ca = pct_reduction(tok_j, tok_ca)
+    saved_j_cf = [j - cf for j, cf in zip(tok_j, tok_cf)]
+    saved_cf_ca = [cf - ca for cf, ca in zip(tok_cf, tok_ca)]
+    bytes_saved_cf_ca = [cfb - cab for cfb, cab in zip(bytes_cf, bytes_ca)]
+    per_item_j, per_item_cf, per_item_ca = (
+        [n / scale for n, scale in zip(col, SCALES)] for col in (tok_j, tok_cf, tok_ca)
+    )
+
+    # Build markdown report, streamed straight into the buffered report file
+    with open(REPORT_PATH, "w", buffering=REPORT_BUFFER_SIZE) as f:
+        emit = functools.partial(print, file=f)  # one report line per call
+        emit("# Field Alias Token Measurement Results")
+        emit()
+        emit("**Date:** 2026-02-12")
+        emit("**Encoding:** cl100k_base (GPT-4 / Claude-compatible BPE tokenizer)")
+        emit("**Seed:** 42 (reproducible)")
+        emit()
+        emit("## Methodology")
+        emit()
+        emit("Generated synthetic task tracker payloads at 4 scales (5, 20, 100, 500 items)")
+        emit("with 8 fields per item: id, name, status, assignee, description, priority, created, updated.")
+        emit()
+        emit("Three format variants per scale:")
+        emit("- **JSON**: Standard `json.dumps(items, indent=2)` — pretty-printed JSON array")
+        emit("- **Compact-full**: CSV-style with full field names as header, data rows below")
+        emit("- **Compact-alias**: Same CSV-style but header uses 1-char abbreviations (id->i, name->n, etc.)")
+        emit()
+        emit("Token counts measured with `tiktoken` using `cl100k_base` encoding.")
+        emit()
+
+        # Table 1: Raw counts
+        emit("## 1. Raw Token Counts")
+        emit()
+        emit("| Scale | JSON | Compact-Full | Compact-Alias | JSON bytes | Compact-Full bytes | Compact-Alias bytes |")
+        emit("|------:|-----:|-------------:|--------------:|-----------:|-------------------:|--------------------:|")
+        row = "| {} | {:,} | {:,} | {:,} | {:,} | {:,} | {:,} |".format
+        for cols in zip(SCALES, tok_j, tok_cf, tok_ca, bytes_j, bytes_cf, bytes_ca):
+            emit(row(*cols))
+        emit()
+
+        # Table 2: JSON -> Compact-Full savings
+        emit("## 2. Savings: JSON to Compact-Full")
+        emit()
+        emit("| Scale | JSON Tokens | Compact-Full Tokens | Saved | % Reduction |")
+        emit("|------:|------------:|--------------------:|------:|------------:|")
+        row = "| {} | {:,} | {:,} | {:,} | {:.1f}% |".format
+        for cols in zip(SCALES, tok_j, tok_cf, saved_j_cf, pct_j_cf):
+            emit(row(*cols))
+        emit()
+
+        # Table 3: Compact-Full -> Compact-Alias savings (THE KEY METRIC)
+        emit("## 3. Marginal Savings: Compact-Full to Compact-Alias (KEY METRIC)")
+        emit()
+        emit("This measures the **incremental benefit** of abbreviating field names in the header,")
+        emit("given that we already use compact tabular format.")
+        emit()
+        emit("| Scale | Compact-Full Tokens | Compact-Alias Tokens | Tokens Saved | % Reduction | Bytes Saved |")
+        emit("|------:|--------------------:|---------------------:|-------------:|------------:|------------:|")
+        row = "| {} | {:,} | {:,} | {:,} | {:.2f}% | {:,} |".format
+        for cols in zip(SCALES, tok_cf, tok_ca, saved_cf_ca, pct_cf_ca, bytes_saved_cf_ca):
+            emit(row(*cols))
+        emit()
+
+        # Table 4: Full comparison summary
+        emit("## 4. Full Comparison Summary")
+        emit()
+        emit("| Scale | JSON | Compact-Full | Compact-Alias | JSON->CF % | CF->CA % | JSON->CA % |")
+        emit("|------:|-----:|-------------:|--------------:|-----------:|---------:|-----------:|")
+        row = "| {} | {:,} | {:,} | {:,} | {:.1f}% | {:.2f}% | {:.1f}% |".format
+        for cols in zip(SCALES, tok_j, tok_cf, tok_ca, pct_j_cf, pct_cf_ca, pct_j_ca):
+            emit(row(*cols))
+        emit()
+
+        # Table 5: Tokens per item
+        emit("## 5. Tokens Per Item (Amortized)")
+        emit()
+        emit("| Scale | JSON/item | Compact-Full/item | Compact-Alias/item |")
+        emit("|------:|----------:|------------------:|-------------------:|")
+        row = "| {} | {:.1f} | {:.1f} | {:.1f} |".format
+        for cols in zip(SCALES, per_item_j, per_item_cf, per_item_ca):
+            emit(row(*cols))
+        emit()
+
+        # Analysis
+        emit("## 6. Analysis")
+        emit()
+
+        # Calculate averages for the key metric
+        avg_j_cf = sum(pct_j_cf) / len(pct_j_cf)
+        avg_cf_ca = sum(pct_cf_ca) / len(pct_cf_ca)
+
+        emit("### JSON to Compact-Full: Large, Consistent Win")
+        emit()
+        emit(f"Switching from JSON to compact tabular format saves **~{avg_j_cf:.0f}%** of tokens on average.")
+        emit("This is a substantial reduction driven by eliminating:")
+        emit("- Repeated field name keys on every item")
+        emit("- JSON structural characters (`{{`, `}}`, `[`, `]`, `:`, `\"`)")
+        emit("- Indentation whitespace")
+        emit()
+        emit("The savings scale well: they remain consistent as item count grows,")
+        emit("because the overhead is proportional to the number of items in JSON.")
+        emit()
+
+        emit("### Compact-Full to Compact-Alias: Negligible Marginal Benefit")
+        emit()
+        emit(f"Abbreviating field names in the header saves **~{avg_cf_ca:.2f}%** of tokens on average.")
+        emit(f"In absolute terms, the savings are **{saved_cf_ca[0]} tokens** (5 items) to **{saved_cf_ca[-1]} tokens** (500 items).")
+        emit()
+        emit("Why so small? Because in the compact format, field names appear **only once** — in the header row.")
+        emit("The header `id,name,status,assignee,description,priority,created,updated` is a single line")
+        emit("consuming a fixed number of tokens regardless of how many data rows follow.")
+        emit("Abbreviating it to `i,n,s,a,d,p,c,u` saves those few tokens once, and that's it.")
+        emit()
+        emit("The data rows (which dominate the payload) are identical in both variants.")
+        emit()
+
+        emit("### Cost-Benefit Verdict")
+        emit()
+        emit("| Factor | Assessment |")
+        emit("|--------|-----------|")
+        emit(f"| Token savings | {avg_cf_ca:.2f}% average — negligible |")
+        emit(f"| Absolute savings at 500 items | {saved_cf_ca[-1]} tokens — trivial |")
+        emit("| Readability cost | High — `i,n,s,a,d,p,c,u` is unreadable without a legend |")
+        emit("| Implementation complexity | Moderate — need alias registry, mapping, docs |")
+        emit("| Agent confusion risk | Non-trivial — agents may misinterpret abbreviated headers |")
+        emit("| Schema discoverability | Degraded — header no longer self-documenting |")
+        emit()
+        emit("**Recommendation: Do NOT implement field name aliases.**")
+        emit()
+        emit("The marginal token savings are negligible compared to the readability and complexity costs.")
+        emit("The big win is already captured by switching from JSON to compact tabular format.")
+        emit("Further compression efforts should target the data values themselves (e.g., date format")
+        emit("abbreviation, status code mapping) rather than the one-time header line, though even those")
+        emit("are unlikely to be worth the tradeoff.")
+    print(f"Report written to: {REPORT_PATH}")
 
     # Also print summary
     print("\n=== SUMMARY ===")
     print(f"JSON -> Compact-Full:  ~{avg_j_cf:.0f}% token reduction (BIG WIN)")
     print(f"Compact-Full -> Alias: ~{avg_cf_ca:.2f}% token reduction (NEGLIGIBLE)")
-    print(f"Absolute alias savings: {cf_ca_abs[0]}-{cf_ca_abs[-1]} tokens across scales")
+    print(f"Absolute alias savings: {saved_cf_ca[0]}-{saved_cf_ca[-1]} tokens across scales")
 
 
 if __name__ == "__main__":